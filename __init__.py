@@ -1,12 +1,15 @@
 import asyncio
+import atexit
 import configparser
-import json
 import logging
+import os
 import re
 from datetime import datetime
+from logging.handlers import MemoryHandler, RotatingFileHandler
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
+import orjson
 from nonebot import get_driver, on_message, require
 from nonebot.adapters.onebot.v11 import (
     Bot,
@@ -45,39 +48,67 @@ __plugin_meta__ = PluginMetadata(
 CONFIG_PATH = Path("data") / "bdsmm"
 CONFIG_FILE = CONFIG_PATH / "bdsmm_config.ini"
 QUEUE_FILE = CONFIG_PATH / "bdsmm_queue.json"
+QUEUE_TMP_FILE = CONFIG_PATH / "bdsmm_queue.json.tmp"
 LOG_FILE = CONFIG_PATH / "bdsmm.log"
 
 # --- Initial Setup ---
 # Ensure the plugin's data directory exists.
 CONFIG_PATH.mkdir(parents=True, exist_ok=True)
 if not QUEUE_FILE.is_file():
-    with open(QUEUE_FILE, "w") as file:
-        json.dump({}, file)
+    QUEUE_FILE.write_bytes(orjson.dumps({}))
 
 # --- Logger Configuration ---
 # Sets up a dedicated logger for this plugin to separate its logs
 # from NoneBot's main log, making debugging easier.
+# Records are buffered in memory and written in batches; errors flush the
+# buffer immediately so they are never held back. The log file is rotated
+# once it grows past 10 MB.
 log_formatter = logging.Formatter(
     "[%(asctime)s] [%(name)s] [%(levelname)s] - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 )
-file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+file_handler = RotatingFileHandler(
+    LOG_FILE, maxBytes=10_000_000, backupCount=5, encoding="utf-8"
+)
 file_handler.setFormatter(log_formatter)
+buffered_handler = MemoryHandler(
+    capacity=100, flushLevel=logging.ERROR, target=file_handler
+)
+atexit.register(buffered_handler.flush)
 bdsm_logger = logging.getLogger("bdsmm")
-bdsm_logger.addHandler(file_handler)
+bdsm_logger.addHandler(buffered_handler)
 bdsm_logger.setLevel(logging.INFO)
 
+# --- Precompiled Patterns ---
+# Compiled once at import time; parse_content_to_message uses it on the content
+# of every sendmessage, whether sent immediately or on schedule.
+_TOKEN_RE = re.compile(r"\{at_all\}|\{\:Image\(url=\"(?P<url>.*?)\"\)\}")
+
 # --- Configuration Class ---
 class Config:
     """
     Handles loading and parsing of the plugin's configuration from bdsmm_config.ini.
     """
     def __init__(self):
-        self.admin_groups: List[int] = []
-        self.receiver_groups: List[int] = []
-        self.admins: List[int] = []
+        self.admin_groups: FrozenSet[int] = frozenset()
+        self.receiver_groups: FrozenSet[int] = frozenset()
+        self.admins: FrozenSet[int] = frozenset()
         self._load_config()
 
+    def reload(self):
+        """
+        Re-reads the configuration file and republishes the module-level
+        lookup sets used by the message handler.
+        """
+        global _ADMIN_GROUPS, _RECEIVER_GROUPS, _ADMINS
+        self.admin_groups = frozenset()
+        self.receiver_groups = frozenset()
+        self.admins = frozenset()
+        self._load_config()
+        _ADMIN_GROUPS = self.admin_groups
+        _RECEIVER_GROUPS = self.receiver_groups
+        _ADMINS = self.admins
+
     def _load_config(self):
         if not CONFIG_FILE.exists():
             # Create default config file
@@ -95,74 +126,126 @@ class Config:
         config = configparser.ConfigParser()
         config.read(CONFIG_FILE, encoding="utf-8")
 
-        # Safely parse comma-separated lists of group and admin IDs.
+        # Safely parse comma-separated lists of group and admin IDs. They are
+        # stored as frozensets since they are only used for membership checks.
         if "bdsmm_Groups" in config:
             admin_groups_str = config["bdsmm_Groups"].get("admin_groups", "")
-            self.admin_groups = (
-                [int(g.strip()) for g in admin_groups_str.split(",") if g.strip()]
-                if admin_groups_str
-                else []
+            self.admin_groups = frozenset(
+                int(g.strip()) for g in admin_groups_str.split(",") if g.strip()
             )
             receiver_groups_str = config["bdsmm_Groups"].get("receiver_groups", "")
-            self.receiver_groups = (
-                [int(g.strip()) for g in receiver_groups_str.split(",") if g.strip()]
-                if receiver_groups_str
-                else []
+            self.receiver_groups = frozenset(
+                int(g.strip()) for g in receiver_groups_str.split(",") if g.strip()
             )
 
         if "bdsmm_Admins" in config:
             admins_str = config["bdsmm_Admins"].get("admin", "")
-            self.admins = (
-                [int(a.strip()) for a in admins_str.split(",") if a.strip()]
-                if admins_str
-                else []
+            self.admins = frozenset(
+                int(a.strip()) for a in admins_str.split(",") if a.strip()
             )
 
         # Log the loaded configuration for verification.
         bdsm_logger.info(
-            f"Config loaded. Admin groups: {self.admin_groups}, Receiver groups: {self.receiver_groups}, Admins: {self.admins}"
+            "Config loaded. Admin groups: %s, Receiver groups: %s, Admins: %s",
+            sorted(self.admin_groups),
+            sorted(self.receiver_groups),
+            sorted(self.admins),
         )
 
 
 # Instantiate the configuration.
 config = Config()
 
+# Bound to module-level names so the per-message permission checks don't go
+# through attribute lookups on config. Config.reload() keeps them in sync.
+_ADMIN_GROUPS = config.admin_groups
+_RECEIVER_GROUPS = config.receiver_groups
+_ADMINS = config.admins
+
 driver = get_driver()
 
+# --- Persistent Queue State ---
+# In-memory copy of bdsmm_queue.json. It is read from disk once on startup;
+# after that every lookup goes through this dict and the file is only written.
+# Each entry also carries its parsed timestamp under "_dt", which is stripped
+# again before the queue is written out.
+_queue: Dict[str, Dict] = {}
+# Serializes queue mutations and the flusher's snapshot of the queue. Like
+# the flusher's event it is created on startup, on the driver's loop.
+_queue_lock: Optional[asyncio.Lock] = None
+
+# Queue writes are debounced: mutations only mark the queue dirty and wake the
+# flusher, which waits QUEUE_FLUSH_DELAY seconds so that a burst of changes is
+# written to disk once. The event is created on startup so that it belongs to
+# the loop the driver actually runs on.
+QUEUE_FLUSH_DELAY = 0.2
+_queue_dirty = False
+# Job IDs contained in the last snapshot that reached the disk, used to report
+# what would be lost if the queue cannot be written during shutdown.
+_queue_persisted_ids: FrozenSet[str] = frozenset()
+_queue_stopping = False
+_queue_event: Optional[asyncio.Event] = None
+_queue_flusher_task: Optional[asyncio.Task] = None
+
+
 # --- Startup and Shutdown ---
 @driver.on_startup
 async def on_startup():
     """
     Loads any tasks from the queue that were scheduled before a bot restart.
     """
+    global _queue_event, _queue_lock, _queue_flusher_task, _queue_persisted_ids
+
+    _queue_event = asyncio.Event()
+    _queue_lock = asyncio.Lock()
+
     if QUEUE_FILE.exists():
-        with open(QUEUE_FILE, "r", encoding="utf-8") as f:
-            try:
-                queue = json.load(f)
-                if not isinstance(queue, dict):
-                    bdsm_logger.warning(
-                        f"{QUEUE_FILE} does not contain a valid dictionary. Re-initializing."
-                    )
-                    queue = {}
-
-                for job_id, job_info in queue.items():
-                    timestamp = datetime.fromisoformat(job_info["timestamp"])
-                    if timestamp > datetime.now():
-                        scheduler.add_job(
-                            execute_scheduled_task,
-                            "date",
-                            run_date=timestamp,
-                            id=job_id,
-                            args=[
-                                job_info["type"],
-                                job_info["content"],
-                                job_info["target_group"],
-                                job_id,
-                            ],
-                        )
-                        bdsm_logger.info(f"Loaded scheduled job {job_id}")
-            except json.JSONDecodeError:
-                bdsm_logger.error(f"Failed to decode {QUEUE_FILE}. Starting with an empty queue.")
+        try:
+            queue = await asyncio.to_thread(_read_queue_file)
+        except orjson.JSONDecodeError:
+            bdsm_logger.error("Failed to decode %s. Starting with an empty queue.", QUEUE_FILE)
+            queue = {}
+        if not isinstance(queue, dict):
+            bdsm_logger.warning(
+                "%s does not contain a valid dictionary. Re-initializing.", QUEUE_FILE
+            )
+            queue = {}
+        _queue.update(queue)
+        _queue_persisted_ids = frozenset(queue)
+
+        for job_id, job_info in _queue.items():
+            timestamp = job_info["_dt"] = datetime.fromisoformat(job_info["timestamp"])
+            if timestamp > datetime.now():
+                scheduler.add_job(
+                    execute_scheduled_task,
+                    "date",
+                    run_date=timestamp,
+                    id=job_id,
+                    args=[
+                        job_info["type"],
+                        job_info["content"],
+                        job_info["target_group"],
+                        job_id,
+                    ],
+                )
+                bdsm_logger.info("Loaded scheduled job %s", job_id)
+
+    _queue_flusher_task = asyncio.create_task(_queue_flusher())
+
+
+@driver.on_shutdown
+async def on_shutdown():
+    """
+    Asks the queue flusher to write out any pending changes and waits for it
+    to exit, so no write is still running when the bot stops.
+    """
+    global _queue_stopping
+    _queue_stopping = True
+    if _queue_flusher_task and not _queue_flusher_task.done():
+        _queue_event.set()
+        await _queue_flusher_task
+    elif _queue_dirty:
+        await _flush_queue()
 
 # --- Scheduled Task Execution ---
 async def execute_scheduled_task(
@@ -172,12 +255,12 @@ async def execute_scheduled_task(
     This function is the entry point for all tasks executed by the scheduler.
     It retrieves a bot instance and executes the corresponding command.
     """
-    bots = get_driver().bots
+    bots = driver.bots
     if not bots:
         bdsm_logger.error("No bot instance available to execute scheduled task.")
         return
 
-    bot = list(bots.values())[0]  # Get the first available bot instance.
+    bot = next(iter(bots.values()))  # Get the first available bot instance.
 
     try:
         message_to_send = None
@@ -193,64 +276,161 @@ async def execute_scheduled_task(
             message_id = msg_info["message_id"]
 
             bdsm_logger.info(
-                f"Executed scheduled job {job_id}: Sent message to group {target_group}. MessageID: {message_id}"
+                "Executed scheduled job %s: Sent message to group %s. MessageID: %s",
+                job_id, target_group, message_id,
             )
 
-            # Send confirmation to admin groups
+            # Send confirmation to all admin groups concurrently.
             confirmation_message = f"Scheduled message sent to group {target_group}.\nMessageID: {message_id}"
-            for admin_group in config.admin_groups:
-                try:
-                    await bot.send_group_msg(
-                        group_id=admin_group, message=confirmation_message
-                    )
-                except Exception as e:
+            admin_groups = tuple(_ADMIN_GROUPS)
+            results = await asyncio.gather(
+                *(
+                    bot.send_group_msg(group_id=admin_group, message=confirmation_message)
+                    for admin_group in admin_groups
+                ),
+                return_exceptions=True,
+            )
+            for admin_group, result in zip(admin_groups, results):
+                if isinstance(result, Exception):
                     bdsm_logger.error(
-                        f"Failed to send confirmation to admin group {admin_group}: {e}"
+                        "Failed to send confirmation to admin group %s: %s",
+                        admin_group, result,
                     )
 
         # Once the task is done, remove it from the persistent queue.
-        remove_from_queue(job_id)
+        await remove_from_queue(job_id)
     except Exception as e:
-        bdsm_logger.error(f"Failed to execute scheduled job {job_id}: {e}")
+        bdsm_logger.error("Failed to execute scheduled job %s: %s", job_id, e)
 
 # --- Queue Management ---
-def save_to_queue(job_id: str, task_info: Dict):
+def _read_queue_file():
     """
-    Adds or updates a task in the bdsmm_queue.json file.
-    This ensures that scheduled tasks persist across bot restarts.
+    Reads and decodes bdsmm_queue.json. Blocking; run it in a worker thread.
     """
-    queue = {}
-    if QUEUE_FILE.exists():
-        with open(QUEUE_FILE, "r", encoding="utf-8") as f:
+    with open(QUEUE_FILE, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _write_queue_file(queue: Dict):
+    """
+    Writes a queue snapshot to bdsmm_queue.json. The data is written to a
+    temporary file first and then moved into place, so a crash mid-write
+    never leaves a truncated queue behind. Blocking; run it in a worker thread.
+    """
+    with open(QUEUE_TMP_FILE, "wb") as f:
+        f.write(orjson.dumps(queue, option=orjson.OPT_INDENT_2))
+    os.replace(QUEUE_TMP_FILE, QUEUE_FILE)
+
+
+async def _flush_queue():
+    """
+    Persists the in-memory queue without blocking the event loop. A snapshot
+    is taken first so handlers can keep mutating the queue during the write.
+    If the write fails the queue is marked dirty again, so the next flush
+    retries it.
+    """
+    global _queue_dirty, _queue_persisted_ids
+    async with _queue_lock:
+        _queue_dirty = False
+        snapshot = {
+            job_id: {key: value for key, value in info.items() if key != "_dt"}
+            for job_id, info in _queue.items()
+        }
+    try:
+        await asyncio.to_thread(_write_queue_file, snapshot)
+    except Exception:
+        async with _queue_lock:
+            _queue_dirty = True
+        raise
+    _queue_persisted_ids = frozenset(snapshot)
+
+
+def _mark_queue_dirty():
+    """
+    Schedules a debounced write of the queue.
+    """
+    global _queue_dirty
+    _queue_dirty = True
+    _queue_event.set()
+
+
+async def _queue_flusher():
+    """
+    Background task that persists the queue whenever it has been changed,
+    coalescing all changes made within QUEUE_FLUSH_DELAY into one write.
+    Once shutdown has been requested it flushes without waiting and exits as
+    soon as nothing is left to write. A failed write is retried on the next
+    wake-up; during shutdown it gets one final attempt.
+    """
+    while True:
+        await _queue_event.wait()
+        if not _queue_stopping:
+            await asyncio.sleep(QUEUE_FLUSH_DELAY)
+        _queue_event.clear()
+        if _queue_dirty:
             try:
-                queue = json.load(f)
-                if not isinstance(queue, dict):
-                    queue = {}
-            except json.JSONDecodeError:
-                pass  # Start with an empty queue if file is corrupt
-    queue[job_id] = task_info
-    with open(QUEUE_FILE, "w", encoding="utf-8") as f:
-        json.dump(queue, f, indent=4, ensure_ascii=False)
+                await _flush_queue()
+            except Exception as e:
+                bdsm_logger.error("Failed to write %s: %s", QUEUE_FILE, e)
+                if _queue_stopping:
+                    bdsm_logger.error(
+                        "Giving up on %s at shutdown. Unsaved jobs: %s. "
+                        "Removed jobs that will return after a restart: %s",
+                        QUEUE_FILE,
+                        sorted(set(_queue) - _queue_persisted_ids),
+                        sorted(_queue_persisted_ids - set(_queue)),
+                    )
+                    return
+        if _queue_stopping and not _queue_dirty:
+            return
 
 
-def remove_from_queue(job_id: str):
+async def save_to_queue(job_id: str, task_info: Dict, send_time: datetime):
+    """
+    Adds or updates a task in the persistent queue.
+    This ensures that scheduled tasks persist across bot restarts.
+    `send_time` is the already parsed form of task_info["timestamp"].
     """
-    Removes a task from the bdsmm_queue.json file, typically after it has been
+    entry = {**task_info, "_dt": send_time}
+    async with _queue_lock:
+        _queue[job_id] = entry
+        _mark_queue_dirty()
+
+
+async def remove_from_queue(job_id: str):
+    """
+    Removes a task from the persistent queue, typically after it has been
     executed or canceled.
     """
-    if not QUEUE_FILE.exists():
-        return
-    with open(QUEUE_FILE, "r", encoding="utf-8") as f:
-        try:
-            queue = json.load(f)
-            if not isinstance(queue, dict):
-                return # Can't remove from a non-dictionary
-        except json.JSONDecodeError:
-            return  # Nothing to remove
-    if job_id in queue:
-        del queue[job_id]
-        with open(QUEUE_FILE, "w", encoding="utf-8") as f:
-            json.dump(queue, f, indent=4, ensure_ascii=False)
+    async with _queue_lock:
+        if _queue.pop(job_id, None) is not None:
+            _mark_queue_dirty()
+
+
+def _parse_cmd(text: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Splits a `[type][timestamp][content][target]` command into its four
+    stripped fields. Returns None if the text does not have that shape.
+    """
+    if len(text) < 8 or text[0] != "[" or text[-1] != "]":
+        return None
+    parts = text[1:-1].split("][", 3)
+    if len(parts) != 4:
+        return None
+    command_type, timestamp, content, target = parts
+    return command_type.strip(), timestamp.strip(), content.strip(), target.strip()
+
+
+def _parse_timestamp(timestamp_str: str) -> datetime:
+    """
+    Parses a command timestamp in YYYYMMDDHHMMSS or YYYYMMDDHHMM format.
+    Raises ValueError for anything else.
+    """
+    if len(timestamp_str) == 14:
+        return datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
+    if len(timestamp_str) == 12:
+        return datetime.strptime(timestamp_str, "%Y%m%d%H%M")
+    raise ValueError("Incorrect timestamp length")
 
 
 def parse_content_to_message(content: str) -> Message:
@@ -262,28 +442,27 @@ def parse_content_to_message(content: str) -> Message:
     """
     content = content.replace("\\n", "\n")
 
-    # Regex to split the string by our custom tags, but keep the tags
-    tag_regex = r"(\{at_all\}|\{\:Image\(url=\".*?\"\)\})"
-    parts = re.split(tag_regex, content)
+    # Walk the custom tags in a single pass, emitting the plain text between
+    # them as text segments. Segments are collected in a plain list and the
+    # Message is built once at the end.
+    segments: List[MessageSegment] = []
+    last = 0
 
-    message = Message()
-    image_url_regex = r"\{\:Image\(url=\"(.*?)\"\)\}"
+    for match in _TOKEN_RE.finditer(content):
+        if match.start() > last:
+            segments.append(MessageSegment.text(content[last:match.start()]))
 
-    for part in parts:
-        if not part:  # re.split can produce empty strings
-            continue
-        
-        if part == "{at_all}":
-            message += MessageSegment.at("all")
-        elif re.match(image_url_regex, part):
-            match = re.search(image_url_regex, part)
-            if match:
-                url = match.group(1)
-                message += MessageSegment.image(file=url)
+        url = match["url"]
+        if url is None:  # {at_all}
+            segments.append(MessageSegment.at("all"))
         else:
-            message += MessageSegment.text(part)
-            
-    return message
+            segments.append(MessageSegment.image(file=url))
+        last = match.end()
+
+    if last < len(content):
+        segments.append(MessageSegment.text(content[last:]))
+
+    return Message(segments)
 
 # --- Permission Check ---
 def is_admin(user_id: int) -> bool:
@@ -291,15 +470,24 @@ def is_admin(user_id: int) -> bool:
     Checks if a user is authorized to issue commands. If the admin list in the
     config is empty, all users in admin groups are considered admins.
     """
-    if not config.admins:
+    if not _ADMINS:
         return True
-    return user_id in config.admins
+    return user_id in _ADMINS
 
 
 def is_bdsm_command() -> Rule:
     async def _is_bdsm_command(event: MessageEvent, state: T_State) -> bool:
         msg = event.get_plaintext().strip()
-        if re.match(r"\[(.*?)\]\[(.*?)\]\[(.*?)\]\[(.*?)\]", msg, re.DOTALL):
+        # Cheap pre-check so ordinary chatter is rejected before parsing.
+        if not msg:
+            return False
+        if msg[0] != "[" and msg.lower() != "message":
+            return False
+        state["bdsm_text"] = msg
+        command = _parse_cmd(msg)
+        if command:
+            # Hand the fields to the handler so it doesn't have to re-parse.
+            state["bdsm_command"] = command
             return True
         if msg.lower() == 'message':
             return True
@@ -310,16 +498,63 @@ def is_bdsm_command() -> Rule:
 # --- Main Message Handler ---
 message_handler = on_message(rule=to_me() & is_bdsm_command(), priority=10, block=True)
 
+# JobID prefix and wording used when scheduling each kind of delayed task.
+_SCHEDULED_COMMANDS = {
+    "sendmessage": ("job", "message", "Message"),
+    "forwardmessage": ("job_forward", "forward", "Forward message"),
+}
+
+
+async def _enqueue_job(
+    command_type: str, content: str, target_group: int, timestamp_str: str
+):
+    """
+    Schedules a sendmessage or forwardmessage task for the given timestamp,
+    persists it to the queue and reports the JobID back to the admin group.
+    """
+    job_prefix, noun, title = _SCHEDULED_COMMANDS[command_type]
+    try:
+        send_time = _parse_timestamp(timestamp_str)
+
+        job_id = f"{job_prefix}_{send_time.timestamp()}_{target_group}"
+        scheduler.add_job(
+            execute_scheduled_task,
+            "date",
+            run_date=send_time,
+            id=job_id,
+            args=[command_type, content, target_group, job_id],
+        )
+        await save_to_queue(
+            job_id,
+            {
+                "timestamp": send_time.isoformat(),
+                "type": command_type,
+                "content": content,
+                "target_group": target_group,
+            },
+            send_time,
+        )
+        await message_handler.send(
+            f"{title} scheduled for {send_time.strftime('%Y-%m-%d %H:%M:%S')} to group {target_group}."
+            f" JobID: {job_id}"
+        )
+        bdsm_logger.info("Scheduled %s for group %s at %s.", noun, target_group, send_time)
+    except ValueError:
+        await message_handler.send("Invalid timestamp format. Please use YYYYMMDDHHMMSS or YYYYMMDDHHMM.")
+    except Exception as e:
+        await message_handler.send(f"Failed to schedule {noun}: {e}")
+        bdsm_logger.error("Failed to schedule %s for group %s: %s", noun, target_group, e)
+
 
 @message_handler.handle()
-async def handle_message(bot: Bot, event: GroupMessageEvent):
+async def handle_message(bot: Bot, event: GroupMessageEvent, state: T_State):
     """
     This is the primary handler for all incoming commands. It performs
     permission checks, parses the command, and delegates to the appropriate
     function for execution.
     """
     # Only process messages from configured admin groups.
-    if event.group_id not in config.admin_groups:
+    if event.group_id not in _ADMIN_GROUPS:
         return
 
     # Check if the user has admin privileges.
@@ -327,7 +562,7 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         await message_handler.finish("You are not authorized to use this command.")
         return
 
-    command_text = event.get_plaintext().strip()
+    command_text = state["bdsm_text"]
     
     # Provide a simple help message if the user just pings the bot with "message".
     if command_text.lower() == 'message':
@@ -358,13 +593,13 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         )
         return
 
-    # Use regex to parse the command string.
-    match = re.match(r"\[(.*?)\]\[(.*?)\]\[(.*?)\]\[(.*?)\]", command_text, re.DOTALL)
-    if not match:
+    # The command string was already parsed by the rule.
+    command = state.get("bdsm_command")
+    if not command:
         # Silently ignore messages that don't match the command format.
         return
 
-    command_type, timestamp_str, content, target_group_str = (g.strip() for g in match.groups())
+    command_type, timestamp_str, content, target_group_str = command
 
     # Validate the target group ID.
     if not target_group_str.isdigit() and command_type != "schedulemessage":
@@ -373,13 +608,13 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         
     target_group = int(target_group_str) if target_group_str.isdigit() else 0
 
-    if target_group and target_group not in config.receiver_groups:
+    if target_group and target_group not in _RECEIVER_GROUPS:
         await message_handler.finish(f"Group {target_group} is not in the receiver groups list.")
         return
         
     bdsm_logger.info(
-        f"Received command from user {event.user_id} in group {event.group_id}: "
-        f"[{command_type}][{timestamp_str}][...][{target_group_str}]"
+        "Received command from user %s in group %s: [%s][%s][...][%s]",
+        event.user_id, event.group_id, command_type, timestamp_str, target_group_str,
     )
 
     # --- Command Delegation ---
@@ -394,46 +629,12 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
                 await message_handler.send(
                     f"Message sent to group {target_group}. MessageID: {msg_info['message_id']}"
                 )
-                bdsm_logger.info(f"Sent message to group {target_group}.")
+                bdsm_logger.info("Sent message to group %s.", target_group)
             except Exception as e:
                 await message_handler.send(f"Failed to send message: {e}")
-                bdsm_logger.error(f"Failed to send message to group {target_group}: {e}")
+                bdsm_logger.error("Failed to send message to group %s: %s", target_group, e)
         elif timestamp_str.isdigit():  # Scheduled send
-            try:
-                if len(timestamp_str) == 14:
-                    send_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-                elif len(timestamp_str) == 12:
-                    send_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
-                else:
-                    raise ValueError("Incorrect timestamp length")
-
-                job_id = f"job_{send_time.timestamp()}_{target_group}"
-                scheduler.add_job(
-                    execute_scheduled_task,
-                    "date",
-                    run_date=send_time,
-                    id=job_id,
-                    args=["sendmessage", content, target_group, job_id],
-                )
-                save_to_queue(
-                    job_id,
-                    {
-                        "timestamp": send_time.isoformat(),
-                        "type": "sendmessage",
-                        "content": content,
-                        "target_group": target_group,
-                    },
-                )
-                await message_handler.send(
-                    f"Message scheduled for {send_time.strftime('%Y-%m-%d %H:%M:%S')} to group {target_group}."
-                    f" JobID: {job_id}"
-                )
-                bdsm_logger.info(f"Scheduled message for group {target_group} at {send_time}.")
-            except ValueError:
-                await message_handler.send("Invalid timestamp format. Please use YYYYMMDDHHMMSS or YYYYMMDDHHMM.")
-            except Exception as e:
-                await message_handler.send(f"Failed to schedule message: {e}")
-                bdsm_logger.error(f"Failed to schedule message for group {target_group}: {e}")
+            await _enqueue_job("sendmessage", content, target_group, timestamp_str)
                 
     elif command_type == "forwardmessage":
         if not event.reply:
@@ -447,46 +648,14 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
                 await message_handler.send(
                     f"Message forwarded to group {target_group}. MessageID: {msg_info['message_id']}"
                 )
-                bdsm_logger.info(f"Forwarded message to group {target_group}.")
+                bdsm_logger.info("Forwarded message to group %s.", target_group)
             except Exception as e:
                 await message_handler.send(f"Failed to forward message: {e}")
-                bdsm_logger.error(f"Failed to forward message to group {target_group}: {e}")
+                bdsm_logger.error("Failed to forward message to group %s: %s", target_group, e)
         elif timestamp_str.isdigit():
-            try:
-                if len(timestamp_str) == 14:
-                    send_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-                elif len(timestamp_str) == 12:
-                    send_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
-                else:
-                    raise ValueError("Incorrect timestamp length")
-
-                job_id = f"job_forward_{send_time.timestamp()}_{target_group}"
-                scheduler.add_job(
-                    execute_scheduled_task,
-                    "date",
-                    run_date=send_time,
-                    id=job_id,
-                    args=["forwardmessage", str(forward_message), target_group, job_id],
-                )
-                save_to_queue(
-                    job_id,
-                    {
-                        "timestamp": send_time.isoformat(),
-                        "type": "forwardmessage",
-                        "content": str(forward_message),
-                        "target_group": target_group,
-                    },
-                )
-                await message_handler.send(
-                    f"Forward message scheduled for {send_time.strftime('%Y-%m-%d %H:%M:%S')} to group {target_group}."
-                    f" JobID: {job_id}"
-                )
-                bdsm_logger.info(f"Scheduled forward for group {target_group} at {send_time}.")
-            except ValueError:
-                await message_handler.send("Invalid timestamp format. Please use YYYYMMDDHHMMSS or YYYYMMDDHHMM.")
-            except Exception as e:
-                await message_handler.send(f"Failed to schedule forward: {e}")
-                bdsm_logger.error(f"Failed to schedule forward for group {target_group}: {e}")
+            await _enqueue_job(
+                "forwardmessage", str(forward_message), target_group, timestamp_str
+            )
                 
     elif command_type == "recallmessage":
         # Prioritize recalling the message from the reply.
@@ -495,11 +664,11 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
                 recalled_msg_id = event.reply.message_id
                 await bot.delete_msg(message_id=recalled_msg_id)
                 await message_handler.send(f"Message {recalled_msg_id} has been recalled.")
-                bdsm_logger.info(f"Recalled message {recalled_msg_id}.")
+                bdsm_logger.info("Recalled message %s.", recalled_msg_id)
                 return
             except Exception as e:
                 # Log the error but continue to allow fallback.
-                bdsm_logger.error(f"Could not recall from reply: {e}")
+                bdsm_logger.error("Could not recall from reply: %s", e)
         
         # Fallback to using message_id from the content field.
         if not content.isdigit():
@@ -510,45 +679,28 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         try:
             await bot.delete_msg(message_id=message_id)
             await message_handler.send(f"Message {message_id} has been recalled.")
-            bdsm_logger.info(f"Recalled message {message_id} from group {target_group}.")
+            bdsm_logger.info("Recalled message %s from group %s.", message_id, target_group)
         except Exception as e:
             await message_handler.send(f"Failed to recall message: {e}")
-            bdsm_logger.error(f"Failed to recall message {message_id}: {e}")
+            bdsm_logger.error("Failed to recall message %s: %s", message_id, e)
 
     elif command_type == "schedulemessage":
-        if not QUEUE_FILE.exists():
-            await message_handler.send("The schedule queue is empty.")
-            return
-
-        with open(QUEUE_FILE, "r", encoding="utf-8") as f:
-            try:
-                queue = json.load(f)
-            except json.JSONDecodeError:
-                await message_handler.send("Could not read the schedule queue.")
-                return
-
-        if not queue:
+        if not _queue:
             await message_handler.send("The schedule queue is empty.")
             return
 
         # Filtering logic for viewing the schedule.
-        filtered_tasks = queue.copy()
+        filtered_tasks = _queue.copy()
         
         # Filter by timestamp.
         if timestamp_str:
             try:
-                filter_time = None
-                if len(timestamp_str) == 14:
-                    filter_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
-                elif len(timestamp_str) == 12:
-                    filter_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
-
-                if filter_time:
-                    filtered_tasks = {
-                        job_id: info
-                        for job_id, info in filtered_tasks.items()
-                        if datetime.fromisoformat(info["timestamp"]) == filter_time
-                    }
+                filter_time = _parse_timestamp(timestamp_str)
+                filtered_tasks = {
+                    job_id: info
+                    for job_id, info in filtered_tasks.items()
+                    if info["_dt"] == filter_time
+                }
             except ValueError:
                 pass # Ignore invalid time formats during filtering.
 
@@ -583,7 +735,7 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         for job_id, job_info in filtered_tasks.items():
             response += (
                 f"  - JobID: {job_id}\n"
-                f"    Time: {datetime.fromisoformat(job_info['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"    Time: {job_info['_dt'].strftime('%Y-%m-%d %H:%M:%S')}\n"
                 f"    Group: {job_info['target_group']}\n"
                 f"    Content: `{job_info['content'][:30].replace('`', '')}...`\n"
             )
@@ -597,9 +749,9 @@ async def handle_message(bot: Bot, event: GroupMessageEvent):
         job_id_to_cancel = content
         try:
             scheduler.remove_job(job_id_to_cancel)
-            remove_from_queue(job_id_to_cancel)
+            await remove_from_queue(job_id_to_cancel)
             await message_handler.send(f"Scheduled job {job_id_to_cancel} has been canceled.")
-            bdsm_logger.info(f"Canceled scheduled job {job_id_to_cancel}.")
+            bdsm_logger.info("Canceled scheduled job %s.", job_id_to_cancel)
         except Exception as e:
             await message_handler.send(f"Failed to cancel job {job_id_to_cancel}: {e}")
-            bdsm_logger.error(f"Failed to cancel job {job_id_to_cancel}: {e}")
+            bdsm_logger.error("Failed to cancel job %s: %s", job_id_to_cancel, e)